@@ -4,12 +4,16 @@ Handles audio capture and anomaly detection (screams, glass breaks, etc.).
 """
 
 import asyncio
+import bisect
 import logging
+import math
 import threading
+import time
+import warnings
 import numpy as np
+from collections import deque
 from typing import Optional, Callable
 from dataclasses import dataclass
-from datetime import datetime
 import struct
 
 try:
@@ -19,11 +23,96 @@ except ImportError:
     PYAUDIO_AVAILABLE = False
     logging.warning("PyAudio not available - audio detection disabled")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.getLogger(__name__).warning("Numba not available - using fallback audio kernel")
+
+try:
+    # Deprecated since Python 3.11 and removed in 3.13
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
+
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Per-thread int32 scratch for the NumPy kernel, reused across chunks
+_numpy_scratch = threading.local()
+
+
+def _sum_squares_numpy(buf: np.ndarray) -> np.ndarray:
+    """
+    NumPy fallback for the row-wise int16 sum of squares. Squares land in
+    a reused int32 scratch buffer (int16 squares cannot overflow it) and
+    are summed per row in int64.
+    """
+    scratch = getattr(_numpy_scratch, "buf", None)
+    if scratch is None or scratch.shape[0] < buf.shape[0] or scratch.shape[1] != buf.shape[1]:
+        scratch = _numpy_scratch.buf = np.empty(buf.shape, dtype=np.int32)
+    
+    squares = scratch[:buf.shape[0]]
+    np.multiply(buf, buf, out=squares, dtype=np.int32)
+    return squares.sum(axis=1, dtype=np.int64)
+
+
+def _sum_squares_audioop(buf: np.ndarray) -> np.ndarray:
+    """
+    C fallback for the row-wise sum of squares using audioop's single-pass
+    RMS over each raw int16 row. The RMS is truncated to an integer, so the
+    sum of squares is reconstructed from it.
+    """
+    rms = np.fromiter(
+        (audioop.rms(row, 2) for row in buf), dtype=np.int64, count=buf.shape[0]
+    )
+    return rms * rms * buf.shape[1]
+
+
+def _process_chunks_fallback(
+    buf: np.ndarray,
+    sq_thresholds: np.ndarray,
+    last_event_ms: np.ndarray,
+    cooldown_ms: np.ndarray,
+    now_ms: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized fallback for the fused threshold and cooldown kernel."""
+    sums = _sum_squares_audioop(buf) if AUDIOOP_AVAILABLE else _sum_squares_numpy(buf)
+    hits = (sums >= sq_thresholds) & (now_ms - last_event_ms >= cooldown_ms)
+    return sums, hits
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _process_chunks(buf, sq_thresholds, last_event_ms, cooldown_ms, now_ms):
+        """
+        Sum the squares of each int16 PCM row in one pass, then flag rows
+        that exceed their sum-of-squares threshold and are out of cooldown.
+
+        Returns:
+            Tuple of (sums of squares, event mask)
+        """
+        rows, cols = buf.shape
+        sums = np.empty(rows, dtype=np.int64)
+        hits = np.zeros(rows, dtype=np.bool_)
+        for r in range(rows):
+            s = 0
+            for i in range(cols):
+                v = np.int64(buf[r, i])
+                s += v * v
+            sums[r] = s
+            hits[r] = s >= sq_thresholds[r] and now_ms - last_event_ms[r] >= cooldown_ms[r]
+        return sums, hits
+else:
+    _process_chunks = _process_chunks_fallback
+
+
 @dataclass
 class AudioEvent:
     """Represents an audio anomaly event."""
@@ -36,14 +125,30 @@ class AudioEvent:
 class AudioListener:
     """
     Listens for audio anomalies from a microphone or audio stream.
-    Uses PyAudio for cross-platform audio capture.
+    Uses PyAudio in callback mode: PortAudio delivers chunks from its own
+    thread into a bounded queue that the owning AudioEngine drains.
     """
     
+    # Number of chunk slots in the ring; one stays free so the callback never
+    # writes a slot the engine may still be copying. New chunks are dropped
+    # while the ring is full.
+    RING_SLOTS = 32
+    
+    # Event descriptions by amplitude tier, looked up with bisect
+    DESCRIPTION_THRESHOLDS = (0.8, 0.9)
+    DESCRIPTIONS = (
+        "Audio threshold exceeded",
+        "High amplitude sound detected",
+        "Loud noise detected - possible scream or alarm",
+    )
+    
     def __init__(
         self,
         device_id: str = "default",
         device_index: Optional[int] = None,
-        on_event: Optional[Callable[[AudioEvent], None]] = None
+        on_event: Optional[Callable[[AudioEvent], None]] = None,
+        data_ready: Optional[threading.Event] = None,
+        pa: Optional['pyaudio.PyAudio'] = None
     ):
         """
         Initialize the audio listener.
@@ -52,27 +157,37 @@ class AudioListener:
             device_id: Identifier for this audio device
             device_index: PyAudio device index (None for default)
             on_event: Callback function when an audio event is detected
+            data_ready: Event set whenever a new chunk has been queued
+            pa: Shared PyAudio instance (one is created and owned if None)
         """
         self.device_id = device_id
         self.device_index = device_index
         self.on_event = on_event
+        self.data_ready = data_ready or threading.Event()
         
         self._running = False
-        self._thread: Optional[threading.Thread] = None
-        self._pyaudio: Optional['pyaudio.PyAudio'] = None
+        self._pyaudio: Optional['pyaudio.PyAudio'] = pa
+        self._owns_pyaudio = pa is None
         self._stream = None
+        self._overflow_count = 0
         
         # Detection parameters
-        self.threshold = settings.audio_threshold
         self.sample_rate = settings.audio_sample_rate
         self.chunk_size = settings.audio_chunk_size
+        self.threshold = settings.audio_threshold
+        
+        # Preallocated ring of chunks filled by the stream callback, with a
+        # queue of filled slot indices for the engine to consume
+        self._ring = np.empty((self.RING_SLOTS, self.chunk_size), dtype=np.int16)
+        self._ring_head = 0
+        self._pending: deque[int] = deque()
         
-        # Cooldown to prevent flooding
-        self._last_event_time = 0
+        # Cooldown to prevent flooding, tracked on the monotonic clock
         self._cooldown_ms = 2000  # 2 second cooldown between events
+        self._last_event_mono_ms = -self._cooldown_ms
     
     def start(self) -> bool:
-        """Start the audio listener thread."""
+        """Open the audio input stream."""
         if not PYAUDIO_AVAILABLE:
             logger.error("PyAudio is not available")
             return False
@@ -82,23 +197,19 @@ class AudioListener:
             return True
         
         try:
-            self._pyaudio = pyaudio.PyAudio()
+            if self._pyaudio is None:
+                self._pyaudio = pyaudio.PyAudio()
             self._stream = self._pyaudio.open(
                 format=pyaudio.paInt16,
                 channels=1,
                 rate=self.sample_rate,
                 input=True,
                 input_device_index=self.device_index,
-                frames_per_buffer=self.chunk_size
+                frames_per_buffer=self.chunk_size * settings.audio_frames_per_buffer_mult,
+                stream_callback=self._pa_callback
             )
             
             self._running = True
-            self._thread = threading.Thread(
-                target=self._listen_loop,
-                daemon=True,
-                name=f"audio-{self.device_id}"
-            )
-            self._thread.start()
             logger.info(f"Audio listener {self.device_id} started successfully")
             return True
             
@@ -108,13 +219,13 @@ class AudioListener:
             return False
     
     def stop(self):
-        """Stop the audio listener thread."""
+        """Stop the audio listener and close its stream."""
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=5.0)
-            self._thread = None
         self._cleanup()
-        logger.info(f"Audio listener {self.device_id} stopped")
+        logger.info(
+            f"Audio listener {self.device_id} stopped "
+            f"({self._overflow_count} input overflows)"
+        )
     
     def _cleanup(self):
         """Clean up PyAudio resources."""
@@ -126,52 +237,54 @@ class AudioListener:
                 pass
             self._stream = None
         
-        if self._pyaudio:
+        # A shared PyAudio instance is terminated by its AudioEngine
+        if self._pyaudio and self._owns_pyaudio:
             try:
                 self._pyaudio.terminate()
             except Exception:
                 pass
             self._pyaudio = None
     
-    def _listen_loop(self):
-        """Main audio capture loop running in background thread."""
-        while self._running and self._stream:
-            try:
-                # Read audio chunk
-                data = self._stream.read(self.chunk_size, exception_on_overflow=False)
-                
-                # Convert to numpy array
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                
-                # Calculate normalized amplitude (RMS)
-                rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2))
-                normalized_amplitude = rms / 32768.0  # Normalize to 0-1 range
-                
-                # Check if above threshold
-                if normalized_amplitude >= self.threshold:
-                    self._handle_detection(normalized_amplitude)
-                    
-            except Exception as e:
-                if self._running:
-                    logger.exception(f"Error in audio loop: {e}")
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio stream callback; queues the buffer's chunks for the engine."""
+        # Input overflows are tolerated, as with exception_on_overflow=False
+        if status & pyaudio.paInputOverflow:
+            self._overflow_count += 1
+        
+        # The PortAudio buffer may span several chunks; copy each into the
+        # next ring slot. With RING_SLOTS - 1 chunks pending, the next slot
+        # may be the one the engine just popped and is still copying, so the
+        # new chunk is dropped and counted as an overflow instead.
+        chunk_bytes = self.chunk_size * 2
+        for offset in range(0, len(in_data) - chunk_bytes + 1, chunk_bytes):
+            if len(self._pending) >= self.RING_SLOTS - 1:
+                self._overflow_count += 1
+                break
+            
+            slot = self._ring_head
+            self._ring[slot] = np.frombuffer(
+                in_data, dtype=np.int16, count=self.chunk_size, offset=offset
+            )
+            self._pending.append(slot)
+            self._ring_head = (slot + 1) % self.RING_SLOTS
+        self.data_ready.set()
+        return (None, pyaudio.paContinue)
     
-    def _handle_detection(self, amplitude: float):
-        """Handle a detected audio anomaly."""
-        current_time = int(datetime.now().timestamp() * 1000)
+    def _handle_detection(self, amplitude: float, now_mono_ms: int):
+        """
+        Handle a detected audio anomaly.
         
-        # Check cooldown
-        if current_time - self._last_event_time < self._cooldown_ms:
-            return
+        The caller has already checked the cooldown against now_mono_ms.
+        """
+        self._last_event_mono_ms = now_mono_ms
         
-        self._last_event_time = current_time
+        # Wall-clock time is only needed for the emitted event
+        current_time = int(time.time() * 1000)
         
         # Determine event description based on amplitude
-        if amplitude >= 0.9:
-            description = "Loud noise detected - possible scream or alarm"
-        elif amplitude >= 0.8:
-            description = "High amplitude sound detected"
-        else:
-            description = "Audio threshold exceeded"
+        description = self.DESCRIPTIONS[
+            bisect.bisect_right(self.DESCRIPTION_THRESHOLDS, amplitude)
+        ]
         
         event = AudioEvent(
             timestamp=current_time,
@@ -189,6 +302,24 @@ class AudioListener:
             except Exception as e:
                 logger.exception(f"Error in audio event callback: {e}")
     
+    @property
+    def threshold(self) -> float:
+        """Normalized RMS amplitude (0-1) that triggers a detection."""
+        return self._threshold
+    
+    @threshold.setter
+    def threshold(self, value: float):
+        # rms / 32768 >= T  <=>  sum_sq >= (T * 32768)^2 * N, with T * 32768
+        # quantized to int16 PCM units so the whole comparison is integer
+        self._threshold = value
+        self._threshold_pcm = int(value * 32768.0)
+        self._sq_threshold = self._threshold_pcm * self._threshold_pcm * self.chunk_size
+    
+    @property
+    def overflow_count(self) -> int:
+        """Number of stream callbacks that reported lost input."""
+        return self._overflow_count
+    
     @property
     def is_running(self) -> bool:
         """Check if the listener is currently running."""
@@ -198,16 +329,45 @@ class AudioListener:
 class AudioEngine:
     """
     Manages multiple audio listeners and coordinates audio events.
+    A single background thread drains every listener's queued chunks and
+    checks them together as one (listeners x chunk_size) matrix.
     """
     
+    # Seconds a device enumeration is reused by list_devices(); each
+    # refresh re-initializes PortAudio, which can take tens of milliseconds
+    DEVICES_CACHE_TTL = 5.0
+    
     def __init__(self):
         self.listeners: dict[str, AudioListener] = {}
         self._event_callback: Optional[Callable] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._data_ready = threading.Event()
+        self._pa: Optional['pyaudio.PyAudio'] = None
+        self._devices_cache: Optional[tuple[float, list[dict]]] = None
     
     def set_event_callback(self, callback: Callable[[AudioEvent], None]):
         """Set the callback function for audio events."""
         self._event_callback = callback
     
+    def _get_pa(self) -> 'pyaudio.PyAudio':
+        """
+        Lazily create the PyAudio instance shared by all listener streams.
+        Caller must hold the lock.
+        """
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+        return self._pa
+    
+    def _release_pa(self):
+        """Terminate the shared PyAudio instance. Caller must hold the lock."""
+        if self._pa is not None:
+            try:
+                self._pa.terminate()
+            except Exception:
+                pass
+            self._pa = None
+    
     def add_listener(
         self,
         device_id: str,
@@ -218,24 +378,39 @@ class AudioEngine:
             logger.warning(f"Audio listener {device_id} already exists")
             return False
         
-        listener = AudioListener(
-            device_id=device_id,
-            device_index=device_index,
-            on_event=self._event_callback
-        )
+        if not PYAUDIO_AVAILABLE:
+            logger.error("PyAudio is not available")
+            return False
         
-        if listener.start():
+        # Held while opening so list_devices() cannot release the shared
+        # PyAudio instance underneath the new stream
+        with self._lock:
+            listener = AudioListener(
+                device_id=device_id,
+                device_index=device_index,
+                on_event=self._event_callback,
+                data_ready=self._data_ready,
+                pa=self._get_pa()
+            )
+            if not listener.start():
+                return False
+            
             self.listeners[device_id] = listener
-            return True
-        return False
+            self._ensure_loop()
+        return True
     
     def remove_listener(self, device_id: str) -> bool:
         """Stop and remove an audio listener."""
-        if device_id not in self.listeners:
-            return False
+        with self._lock:
+            if device_id not in self.listeners:
+                return False
+            
+            self.listeners.pop(device_id).stop()
+            idle = not self.listeners
         
-        self.listeners[device_id].stop()
-        del self.listeners[device_id]
+        # With no stream open the next enumeration can rescan for new devices
+        if idle:
+            self._devices_cache = None
         return True
     
     def get_listener_status(self, device_id: str) -> Optional[dict]:
@@ -247,7 +422,8 @@ class AudioEngine:
         return {
             "device_id": device_id,
             "is_running": listener.is_running,
-            "threshold": listener.threshold
+            "threshold": listener.threshold,
+            "overflow_count": listener.overflow_count
         }
     
     def get_all_listeners(self) -> list[dict]:
@@ -256,18 +432,148 @@ class AudioEngine:
     
     def stop_all(self):
         """Stop all listeners."""
-        for listener in self.listeners.values():
-            listener.stop()
-        self.listeners.clear()
+        with self._lock:
+            for listener in self.listeners.values():
+                listener.stop()
+            self.listeners.clear()
+            thread = self._thread
+        
+        # Wake the loop so it notices there is nothing left to process
+        self._data_ready.set()
+        if thread:
+            thread.join(timeout=5.0)
+        
+        with self._lock:
+            self._release_pa()
+    
+    def _ensure_loop(self):
+        """Start the batched capture loop if needed. Caller must hold the lock."""
+        if self._thread is not None:
+            return
+        
+        # Compile the kernel before the first chunk arrives
+        zeros = np.zeros(1, dtype=np.int64)
+        _process_chunks(
+            np.zeros((1, settings.audio_chunk_size), dtype=np.int16),
+            zeros, zeros, zeros, 0
+        )
+        
+        self._thread = threading.Thread(
+            target=self._run_batched_loop,
+            daemon=True,
+            name="audio-batch"
+        )
+        self._thread.start()
     
-    @staticmethod
-    def list_devices() -> list[dict]:
-        """List available audio input devices."""
+    def _run_batched_loop(self):
+        """Main audio processing loop running in background thread."""
+        chunk_size = settings.audio_chunk_size
+        buf = np.empty((0, chunk_size), dtype=np.int16)
+        
+        # How long to wait for the remaining streams after the first one
+        # delivers, so one wakeup services all of them (a quarter chunk)
+        coalesce_s = chunk_size / settings.audio_sample_rate / 4
+        
+        # Bind hot-path lookups to locals once, outside the loop
+        data_ready = self._data_ready
+        lock = self._lock
+        process_chunks = _process_chunks
+        fromiter = np.fromiter
+        flatnonzero = np.flatnonzero
+        int64 = np.int64
+        monotonic = time.monotonic
+        monotonic_ns = time.monotonic_ns
+        sqrt = math.sqrt
+        
+        # Errors are logged at most once per second to avoid a log storm
+        # (e.g. a disconnected device failing every round)
+        last_error_ns = 0
+        
+        while True:
+            data_ready.wait()
+            # Clear before draining so chunks queued meanwhile re-arm the event
+            data_ready.clear()
+            
+            with lock:
+                listeners = list(self.listeners.values())
+                if not listeners:
+                    self._thread = None
+                    return
+            
+            if len(listeners) > 1:
+                deadline = monotonic() + coalesce_s
+                while not all(listener._pending for listener in listeners):
+                    remaining = deadline - monotonic()
+                    if remaining <= 0 or not data_ready.wait(remaining):
+                        break
+                    data_ready.clear()
+            
+            if buf.shape[0] < len(listeners):
+                buf = np.empty((len(listeners), chunk_size), dtype=np.int16)
+            
+            # Take one chunk per listener per round until all queues are empty
+            ready = [listener for listener in listeners if listener._pending]
+            while ready:
+                try:
+                    for i, listener in enumerate(ready):
+                        buf[i] = listener._ring[listener._pending.popleft()]
+                    
+                    count = len(ready)
+                    sq_thresholds = fromiter(
+                        (listener._sq_threshold for listener in ready),
+                        dtype=int64, count=count
+                    )
+                    last_event_ms = fromiter(
+                        (listener._last_event_mono_ms for listener in ready),
+                        dtype=int64, count=count
+                    )
+                    cooldown_ms = fromiter(
+                        (listener._cooldown_ms for listener in ready),
+                        dtype=int64, count=count
+                    )
+                    now_ms = monotonic_ns() // 1_000_000
+                    sums, hits = process_chunks(
+                        buf[:count], sq_thresholds, last_event_ms, cooldown_ms, now_ms
+                    )
+                    
+                    # Only cross back into Python for emitted events
+                    for i in flatnonzero(hits):
+                        rms = sqrt(sums[i] / chunk_size)
+                        normalized_amplitude = rms / 32768.0  # Normalize to 0-1 range
+                        ready[i]._handle_detection(normalized_amplitude, now_ms)
+                except Exception as e:
+                    now_ns = monotonic_ns()
+                    if now_ns - last_error_ns > 1_000_000_000:
+                        logger.exception(f"Error in audio loop: {e}")
+                        last_error_ns = now_ns
+                    else:
+                        # Yield instead of spinning in a tight failure loop
+                        time.sleep(0.01)
+                
+                ready = [listener for listener in ready if listener._pending]
+    
+    def list_devices(self) -> list[dict]:
+        """
+        List available audio input devices.
+        Results are cached for DEVICES_CACHE_TTL seconds.
+        """
         if not PYAUDIO_AVAILABLE:
             return []
         
+        cached = self._devices_cache
+        if cached is not None and time.monotonic() - cached[0] < self.DEVICES_CACHE_TTL:
+            return [dict(device) for device in cached[1]]
+        
         devices = []
+        p = None
         try:
+            # PortAudio only scans devices in Pa_Initialize, and only when no
+            # other PyAudio instance is alive, so drop the shared instance
+            # while it is idle and enumerate with a short-lived one
+            with self._lock:
+                if not self.listeners:
+                    self._release_pa()
+            
             p = pyaudio.PyAudio()
             for i in range(p.get_device_count()):
                 info = p.get_device_info_by_index(i)
@@ -277,11 +583,15 @@ class AudioEngine:
                         "name": info.get('name', 'Unknown'),
                         "sample_rate": int(info.get('defaultSampleRate', 44100))
                     })
-            p.terminate()
         except Exception as e:
             logger.error(f"Error listing audio devices: {e}")
+            return devices
+        finally:
+            if p is not None:
+                p.terminate()
         
-        return devices
+        self._devices_cache = (time.monotonic(), devices)
+        return [dict(device) for device in devices]
 
 
 # Global audio engine instance
@@ -6,6 +6,7 @@ Uses Pydantic Settings for environment-based configuration.
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import Optional
+import logging
 import os
 
 
@@ -29,14 +30,28 @@ class Settings(BaseSettings):
     
     # Vision Configuration
     model_path: str = Field(default="yolov8n.pt", env="MODEL_PATH")
+    # Export the .pt model to TensorRT/OpenVINO/NCNN on first start
+    model_export: bool = Field(default=True, env="MODEL_EXPORT")
+    # INT8 OpenVINO export on CPU hosts, calibrated on the given dataset
+    model_int8: bool = Field(default=False, env="MODEL_INT8")
+    int8_calibration_data: str = Field(default="coco128.yaml", env="INT8_CALIBRATION_DATA")
+    imgsz: int = Field(default=640, gt=0, multiple_of=32, env="IMGSZ")  # Inference size, e.g. 480 for many CPU streams
+    max_batch_size: int = Field(default=8, gt=0, env="MAX_BATCH_SIZE")  # Frames per forward pass
     detection_confidence: float = Field(default=0.6, env="DETECTION_CONFIDENCE")
     target_classes: list[int] = [0]  # 0 = person in COCO dataset
-    frame_skip: int = Field(default=2, env="FRAME_SKIP")  # Process every nth frame
+    target_fps: float = Field(default=10.0, gt=0, env="TARGET_FPS")  # Batched inference rate
+    # Mean grey-level change (0-255) needed to run detection; 0 disables the gate
+    motion_threshold: float = Field(default=2.0, env="MOTION_THRESHOLD")
+    # FFmpeg hwaccel for RTSP decoding (cuda, vaapi, ...); default: cuda if present
+    video_hwaccel: Optional[str] = Field(default=None, env="VIDEO_HWACCEL")
     
     # Audio Configuration
     audio_threshold: float = Field(default=0.7, env="AUDIO_THRESHOLD")
     audio_sample_rate: int = Field(default=44100, env="AUDIO_SAMPLE_RATE")
     audio_chunk_size: int = Field(default=1024, env="AUDIO_CHUNK_SIZE")
+    # PortAudio buffer = chunk_size * mult; chunks are still analysed (and
+    # cooldown applied) individually, so this only reduces wakeups
+    audio_frames_per_buffer_mult: int = Field(default=2, gt=0, env="AUDIO_FRAMES_PER_BUFFER_MULT")
     
     # Camera Defaults
     default_camera_url: Optional[str] = Field(default=None, env="DEFAULT_CAMERA_URL")
@@ -48,3 +63,8 @@ class Settings(BaseSettings):
 
 # Global settings instance
 settings = Settings()
+
+# Module logger, not the root one: logging.warning() would configure the root
+# logger before main.py's basicConfig() and silence INFO logs
+if "FRAME_SKIP" in os.environ:
+    logging.getLogger(__name__).warning("FRAME_SKIP is no longer used; set TARGET_FPS instead")
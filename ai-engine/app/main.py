@@ -4,6 +4,7 @@ Provides REST API endpoints and manages vision/audio pipelines.
 """
 
 import asyncio
+import concurrent.futures
 import logging
 from contextlib import asynccontextmanager
 from typing import Optional
@@ -48,6 +49,7 @@ class HealthResponse(BaseModel):
     backend_connected: bool
     cameras_active: int
     audio_listeners_active: int
+    vision_ready: bool
 
 
 class StatusResponse(BaseModel):
@@ -71,7 +73,7 @@ async def handle_visual_detection(camera_id: str, detection: Detection):
         camera_id=camera_id,
         alert_type="VISUAL",
         description=description,
-        image_base64=detection.cropped_image_base64
+        image_jpeg=detection.cropped_image_jpeg
     )
 
 
@@ -81,37 +83,68 @@ async def handle_audio_event(event: AudioEvent):
         camera_id=event.device_id,
         alert_type="AUDIO",
         description=event.description,
-        image_base64="",
         timestamp=event.timestamp
     )
 
 
+def _log_handler_error(future: concurrent.futures.Future):
+    """Log an exception raised by a scheduled event handler."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Error handling event: {error!r}", exc_info=error)
+
+
 def sync_visual_callback(camera_id: str, detection: Detection):
-    """Synchronous wrapper for async visual detection handler."""
-    asyncio.create_task(handle_visual_detection(camera_id, detection))
+    """Schedule the async visual detection handler from a camera thread."""
+    asyncio.run_coroutine_threadsafe(
+        handle_visual_detection(camera_id, detection), app.state.loop
+    ).add_done_callback(_log_handler_error)
 
 
 def sync_audio_callback(event: AudioEvent):
-    """Synchronous wrapper for async audio event handler."""
-    asyncio.create_task(handle_audio_event(event))
+    """Schedule the async audio event handler from the audio thread."""
+    asyncio.run_coroutine_threadsafe(
+        handle_audio_event(event), app.state.loop
+    ).add_done_callback(_log_handler_error)
 
 
 # ============================================================================
 # Application Lifecycle
 # ============================================================================
 
+async def start_vision():
+    """
+    Load the YOLO model in the background, then start the default camera.
+    The first start may export the model, which can take minutes; the API
+    and audio pipeline are available meanwhile, and a failure only leaves
+    vision disabled.
+    """
+    try:
+        await asyncio.to_thread(vision_engine.load_model)
+    except Exception as e:
+        logger.exception(f"Failed to load YOLO model, vision disabled: {e}")
+        return
+    
+    # Start default camera if configured
+    if settings.default_camera_url:
+        vision_engine.add_camera("default", settings.default_camera_url)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting Sentry AI Engine...")
     
+    # Detection callbacks run on worker threads and hand off to this loop
+    app.state.loop = asyncio.get_running_loop()
+    
     # Set up callbacks
     vision_engine.set_detection_callback(sync_visual_callback)
     audio_engine.set_event_callback(sync_audio_callback)
     
-    # Start default camera if configured
-    if settings.default_camera_url:
-        vision_engine.add_camera("default", settings.default_camera_url)
+    app.state.vision_task = asyncio.create_task(start_vision())
     
     logger.info("Sentry AI Engine started successfully")
     
@@ -119,6 +152,7 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("Shutting down Sentry AI Engine...")
+    app.state.vision_task.cancel()
     vision_engine.stop_all()
     audio_engine.stop_all()
     await connector.close()
@@ -160,7 +194,8 @@ async def health_check():
         version=settings.app_version,
         backend_connected=backend_connected,
         cameras_active=len(vision_engine.cameras),
-        audio_listeners_active=len(audio_engine.listeners)
+        audio_listeners_active=len(audio_engine.listeners),
+        vision_ready=vision_engine.is_ready
     )
 
 
@@ -297,10 +332,15 @@ async def remove_audio_listener(device_id: str):
 # ============================================================================
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
+    
+    # uvloop is unavailable on Windows; fall back to the stdlib loop there
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools"
     )
@@ -0,0 +1,64 @@
+"""
+Postprocess module.
+Filters raw YOLO detections before they are cropped and encoded.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _filter_boxes_fallback(
+    cls: np.ndarray,
+    conf: np.ndarray,
+    xyxy: np.ndarray,
+    targets: np.ndarray,
+    conf_th: float
+) -> np.ndarray:
+    """Vectorized fallback for the box filter kernel."""
+    mask = np.isin(cls, targets) & (conf >= conf_th)
+    mask &= (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+    return np.flatnonzero(mask).astype(np.int32)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def filter_boxes(cls, conf, xyxy, targets, conf_th):
+        """
+        Select boxes of a target class with sufficient confidence and a
+        non-empty area in one pass.
+        
+        Returns:
+            Indices of the accepted boxes
+        """
+        n = cls.shape[0]
+        out = np.empty(n, dtype=np.int32)
+        k = 0
+        for i in range(n):
+            if conf[i] < conf_th:
+                continue
+            if xyxy[i, 2] <= xyxy[i, 0] or xyxy[i, 3] <= xyxy[i, 1]:
+                continue
+            for t in targets:
+                if cls[i] == t:
+                    out[k] = i
+                    k += 1
+                    break
+        return out[:k]
+else:
+    filter_boxes = _filter_boxes_fallback
+
+
+def warmup():
+    """Compile the box filter kernel for the dtypes used by the vision engine."""
+    filter_boxes(
+        np.zeros(1, dtype=np.int32),
+        np.zeros(1, dtype=np.float32),
+        np.zeros((1, 4), dtype=np.int32),
+        np.zeros(1, dtype=np.int32),
+        0.5
+    )
@@ -4,6 +4,7 @@ Handles HTTP communication with the Java backend management server.
 """
 
 import httpx
+import orjson
 import asyncio
 import logging
 from typing import Optional
@@ -18,13 +19,31 @@ class ServiceConnector:
     """
     Async HTTP client for communicating with the Spring Boot management server.
     Uses httpx for async HTTP requests with retry logic.
+    
+    Alerts without an image are queued and flushed in small batches so
+    bursts of detections share a single request on a pooled connection.
+    Alerts with an image are sent individually as multipart/form-data.
     """
     
+    # Batching parameters
+    BATCH_MAX_SIZE = 32
+    BATCH_MAX_WAIT = 0.05  # seconds
+    
+    # Retry parameters for connection errors
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5  # seconds, doubled after each attempt
+    
     def __init__(self):
         self.backend_url = settings.backend_url
         self.api_key = settings.api_key
         self.client: Optional[httpx.AsyncClient] = None
         self._lock = asyncio.Lock()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
+        self._batch_supported = True
+        # Batch the flusher is collecting, and the one it is sending
+        self._collecting: list[tuple[dict, asyncio.Future]] = []
+        self._sending: list[tuple[dict, asyncio.Future]] = []
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create the HTTP client."""
@@ -32,9 +51,15 @@ class ServiceConnector:
             async with self._lock:
                 if self.client is None:
                     self.client = httpx.AsyncClient(
+                        http2=True,
                         timeout=httpx.Timeout(30.0),
+                        limits=httpx.Limits(
+                            max_connections=50,
+                            max_keepalive_connections=20,
+                            keepalive_expiry=60
+                        ),
+                        # Content-Type is set per request (JSON or multipart)
                         headers={
-                            "Content-Type": "application/json",
                             "X-API-KEY": self.api_key
                         }
                     )
@@ -45,17 +70,21 @@ class ServiceConnector:
         camera_id: str,
         alert_type: str,
         description: str,
-        image_base64: str = "",
+        image_jpeg: bytes = b"",
         timestamp: Optional[int] = None
     ) -> bool:
         """
         Send an alert to the management server.
         
+        Alerts without an image are queued and sent with any others raised
+        within BATCH_MAX_WAIT seconds. Alerts with an image are sent at once
+        as multipart/form-data with the raw JPEG bytes.
+        
         Args:
             camera_id: Unique identifier for the camera
             alert_type: Either "VISUAL" or "AUDIO"
             description: Human-readable description of the alert
-            image_base64: Base64 encoded image data (for visual alerts)
+            image_jpeg: JPEG snapshot bytes (for visual alerts)
             timestamp: Unix timestamp in milliseconds
         
         Returns:
@@ -68,32 +97,138 @@ class ServiceConnector:
             "cameraId": camera_id,
             "alertType": alert_type,
             "description": description,
-            "imageBase64": image_base64,
             "timestamp": timestamp
         }
         
-        try:
-            client = await self._get_client()
-            response = await client.post(
-                f"{self.backend_url}/api/v1/alerts",
-                json=payload
-            )
+        if image_jpeg:
+            return await self._send_with_image(payload, image_jpeg)
+        
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        
+        result = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, result))
+        return await result
+    
+    async def _flush_loop(self):
+        """Collect queued alerts into batches and send them."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            self._collecting = batch
+            deadline = loop.time() + self.BATCH_MAX_WAIT
+            
+            while len(batch) < self.BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
             
-            if response.status_code in (200, 201):
-                logger.info(f"Alert sent successfully: {alert_type} from {camera_id}")
-                return True
+            self._collecting, self._sending = [], batch
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                logger.exception(f"Unexpected error sending alerts: {e}")
+                for _, result in batch:
+                    if not result.done():
+                        result.set_result(False)
+            finally:
+                self._sending = []
+    
+    async def _send_batch(self, batch: list[tuple[dict, asyncio.Future]]):
+        """Send a batch of alerts and resolve their result futures."""
+        if len(batch) > 1 and self._batch_supported:
+            payloads = [payload for payload, _ in batch]
+            response = await self._post_json("/api/v1/alerts/batch", payloads)
+            
+            # Older management servers have no batch endpoint; the path falls
+            # under the read-only /api/v1/alerts/** rule there, hence 403
+            if response is not None and response.status_code in (403, 404, 405):
+                logger.warning("Batch alert endpoint unavailable, sending individually")
+                self._batch_supported = False
             else:
+                success = self._check_response(response, f"batch of {len(batch)}")
+                for _, result in batch:
+                    result.set_result(success)
+                return
+        
+        results = await asyncio.gather(
+            *(self._send_single(payload) for payload, _ in batch)
+        )
+        for (_, result), success in zip(batch, results):
+            result.set_result(success)
+    
+    async def _send_single(self, payload: dict) -> bool:
+        """Send one alert to the management server."""
+        response = await self._post_json("/api/v1/alerts", payload)
+        return self._check_response(
+            response, f"{payload['alertType']} from {payload['cameraId']}"
+        )
+    
+    async def _send_with_image(self, payload: dict, image: bytes) -> bool:
+        """Send one alert with its JPEG snapshot as multipart/form-data."""
+        files = {
+            "meta": (None, orjson.dumps(payload), "application/json"),
+            "image": ("snapshot.jpg", image, "image/jpeg")
+        }
+        response = await self._post("/api/v1/alerts", files=files)
+        return self._check_response(
+            response, f"{payload['alertType']} from {payload['cameraId']}"
+        )
+    
+    async def _post_json(self, path: str, payload) -> Optional[httpx.Response]:
+        """POST a payload serialized with orjson."""
+        return await self._post(
+            path,
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+    
+    async def _post(self, path: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        POST a request body, retrying with backoff only when the request
+        cannot have reached the server (connection and pool errors). Other
+        failures, such as read timeouts, are not retried: the server may
+        already have stored the alert.
+        """
+        client = await self._get_client()
+        delay = self.RETRY_BACKOFF
+        
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            try:
+                return await client.post(f"{self.backend_url}{path}", **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
                 logger.error(
-                    f"Failed to send alert: {response.status_code} - {response.text}"
+                    f"Connection error sending alert (attempt {attempt}/{self.MAX_RETRIES}): {e}"
                 )
-                return False
-                
-        except httpx.RequestError as e:
-            logger.error(f"Network error sending alert: {e}")
-            return False
-        except Exception as e:
-            logger.exception(f"Unexpected error sending alert: {e}")
+                if attempt < self.MAX_RETRIES:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+            except httpx.RequestError as e:
+                logger.error(f"Network error sending alert: {e}")
+                return None
+        return None
+    
+    @staticmethod
+    def _check_response(response: Optional[httpx.Response], what: str) -> bool:
+        """Log the outcome of an alert request and return whether it succeeded."""
+        if response is None:
             return False
+        
+        if response.status_code in (200, 201):
+            logger.info(f"Alert sent successfully: {what}")
+            return True
+        
+        logger.error(
+            f"Failed to send alert: {response.status_code} - {response.text}"
+        )
+        return False
     
     async def health_check(self) -> bool:
         """Check if the backend server is reachable."""
@@ -105,7 +240,40 @@ class ServiceConnector:
             return False
     
     async def close(self):
-        """Close the HTTP client."""
+        """
+        Stop the alert flusher, send any alerts still queued, and close the
+        HTTP client. Every pending send_alert() call is resolved.
+        """
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        
+        # A batch interrupted mid-send may already be stored; report it as
+        # failed rather than risk duplicates
+        for _, result in self._sending:
+            if not result.done():
+                result.set_result(False)
+        self._sending = []
+        
+        # Alerts not sent yet go out in one final batch
+        remaining = self._collecting
+        self._collecting = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        remaining = [(payload, result) for payload, result in remaining if not result.done()]
+        if remaining:
+            try:
+                await self._send_batch(remaining)
+            except Exception as e:
+                logger.exception(f"Unexpected error sending final alerts: {e}")
+            for _, result in remaining:
+                if not result.done():
+                    result.set_result(False)
+        
         if self.client:
             await self.client.aclose()
             self.client = None
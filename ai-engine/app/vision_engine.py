@@ -4,20 +4,36 @@ Handles camera capture and YOLOv11 object detection pipeline.
 """
 
 import cv2
-import base64
+import itertools
+import os
 import asyncio
 import logging
+import platform
 import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Optional, Callable, Dict, Any
 from dataclasses import dataclass
-from queue import Queue, Empty
-from io import BytesIO
-from PIL import Image
 import numpy as np
 
+import torch
 from ultralytics import YOLO
 
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+    logging.getLogger(__name__).warning("PyAV not available - RTSP streams decoded by OpenCV")
+
+try:
+    # Added in PyAV 14
+    from av.codec.hwaccel import HWAccel
+except ImportError:
+    HWAccel = None
+
 from .config import settings
+from . import postprocess
 
 logger = logging.getLogger(__name__)
 
@@ -29,20 +45,26 @@ class Detection:
     class_name: str
     confidence: float
     bbox: tuple[int, int, int, int]  # x1, y1, x2, y2
-    cropped_image_base64: str
+    cropped_image_jpeg: bytes  # empty if encoding failed
 
 
 class CameraHandler:
     """
     Manages video capture from a camera source.
-    Runs frame capture in a background thread to avoid blocking.
+    Runs frame capture in a background thread to avoid blocking; frames
+    are handed to the VisionEngine's batched inference loop.
     """
     
+    # Log a detection summary at INFO level once per this many detections
+    LOG_EVERY = 100
+    
     def __init__(
         self,
         camera_id: str,
         source: str | int,
-        on_detection: Optional[Callable[[str, Detection], None]] = None
+        on_detection: Optional[Callable[[str, Detection], None]] = None,
+        encode_pool: Optional[Executor] = None,
+        frame_ready: Optional[threading.Event] = None
     ):
         """
         Initialize the camera handler.
@@ -51,29 +73,31 @@ class CameraHandler:
             camera_id: Unique identifier for this camera
             source: Video source (URL, file path, or device index)
             on_detection: Callback function when a detection occurs
+            encode_pool: Executor for JPEG encoding and callback dispatch;
+                detections are handled inline when not given
+            frame_ready: Event set whenever a new frame is stored
         """
         self.camera_id = camera_id
         self.source = source
         self.on_detection = on_detection
+        self._encode_pool = encode_pool
+        self._detection_count = itertools.count(1)  # next() is thread-safe
+        self._frame_ready = frame_ready
+        
+        # Detection filter resolved once instead of per frame
+        self._target_array = np.fromiter(settings.target_classes, dtype=np.int32)
+        self._conf_th = float(settings.detection_confidence)
+        
+        # Running mean of a 64x64 grayscale thumbnail for the motion gate
+        self._motion_ref: Optional[np.ndarray] = None
         
         self._capture: Optional[cv2.VideoCapture] = None
+        self._container = None  # PyAV input container for RTSP sources
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._frame_queue: Queue = Queue(maxsize=10)
-        self._frame_count = 0
-        
-        # Load YOLO model
-        self._model: Optional[YOLO] = None
-        self._model_lock = threading.Lock()
-    
-    def _get_model(self) -> YOLO:
-        """Lazy load the YOLO model."""
-        if self._model is None:
-            with self._model_lock:
-                if self._model is None:
-                    logger.info(f"Loading YOLO model: {settings.model_path}")
-                    self._model = YOLO(settings.model_path)
-        return self._model
+        # Single slot holding only the newest frame; older ones are dropped
+        self._latest: Optional[np.ndarray] = None
+        self._latest_lock = threading.Lock()
     
     def start(self) -> bool:
         """Start the camera capture thread."""
@@ -82,14 +106,22 @@ class CameraHandler:
             return True
         
         try:
-            self._capture = cv2.VideoCapture(self.source)
-            if not self._capture.isOpened():
-                logger.error(f"Failed to open camera source: {self.source}")
-                return False
+            if AV_AVAILABLE and isinstance(self.source, str) and self.source.startswith("rtsp://"):
+                self._container = self._open_stream()
+                target = self._stream_loop
+            else:
+                self._capture = self._open_capture()
+                if not self._capture.isOpened():
+                    logger.error(f"Failed to open camera source: {self.source}")
+                    return False
+                
+                # Keep the driver from queueing stale frames behind the newest one
+                self._capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                target = self._capture_loop
             
             self._running = True
             self._thread = threading.Thread(
-                target=self._capture_loop,
+                target=target,
                 daemon=True,
                 name=f"camera-{self.camera_id}"
             )
@@ -99,6 +131,10 @@ class CameraHandler:
             
         except Exception as e:
             logger.exception(f"Error starting camera {self.camera_id}: {e}")
+            self._running = False
+            if self._container and self._thread is None:
+                self._container.close()
+                self._container = None
             return False
     
     def stop(self):
@@ -106,99 +142,271 @@ class CameraHandler:
         self._running = False
         if self._thread:
             self._thread.join(timeout=5.0)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Camera {self.camera_id} capture thread still busy; "
+                    f"its stream is closed when it exits"
+                )
             self._thread = None
         if self._capture:
             self._capture.release()
             self._capture = None
+        # The PyAV container is closed by _stream_loop itself, never while
+        # a decode may still be running on it
         logger.info(f"Camera {self.camera_id} stopped")
     
     def _capture_loop(self):
         """Main capture loop running in background thread."""
-        model = self._get_model()
+        interval = 1.0 / settings.target_fps
+        last_retrieved = 0.0
         
         while self._running and self._capture and self._capture.isOpened():
-            ret, frame = self._capture.read()
-            if not ret:
+            # grab() keeps the stream current without converting the frame
+            if not self._capture.grab():
                 logger.warning(f"Failed to read frame from camera {self.camera_id}")
                 continue
             
-            self._frame_count += 1
+            # Only retrieve as many frames as the inference loop consumes
+            now = time.monotonic()
+            if now - last_retrieved < interval:
+                continue
             
-            # Skip frames for performance
-            if self._frame_count % settings.frame_skip != 0:
+            ret, frame = self._capture.retrieve()
+            if not ret:
+                logger.warning(f"Failed to retrieve frame from camera {self.camera_id}")
                 continue
+            last_retrieved = now
             
-            try:
-                self._process_frame(frame, model)
-            except Exception as e:
-                logger.exception(f"Error processing frame: {e}")
-    
-    def _process_frame(self, frame: np.ndarray, model: YOLO):
-        """Process a single frame through the detection pipeline."""
-        # Run YOLO detection
-        results = model(frame, verbose=False)
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is None:
+            if not self._has_motion(frame):
                 continue
             
-            for i, box in enumerate(boxes):
-                class_id = int(box.cls[0])
-                confidence = float(box.conf[0])
-                
-                # Check if it's a target class with sufficient confidence
-                if (class_id in settings.target_classes and 
-                    confidence >= settings.detection_confidence):
-                    
-                    # Get bounding box coordinates
-                    x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                    
-                    # Crop and encode the detection
-                    cropped = frame[y1:y2, x1:x2]
-                    image_base64 = self._encode_image(cropped)
-                    
-                    # Get class name
-                    class_name = model.names.get(class_id, "unknown")
-                    
-                    detection = Detection(
-                        class_id=class_id,
-                        class_name=class_name,
-                        confidence=confidence,
-                        bbox=(x1, y1, x2, y2),
-                        cropped_image_base64=image_base64
-                    )
-                    
-                    logger.info(
-                        f"Detection: {class_name} ({confidence:.2f}) "
-                        f"at {(x1, y1, x2, y2)} on camera {self.camera_id}"
-                    )
-                    
-                    # Trigger callback if set
-                    if self.on_detection:
-                        try:
-                            self.on_detection(self.camera_id, detection)
-                        except Exception as e:
-                            logger.exception(f"Error in detection callback: {e}")
+            # Replace any frame the inference loop has not picked up yet
+            with self._latest_lock:
+                self._latest = frame
+            if self._frame_ready:
+                self._frame_ready.set()
     
-    @staticmethod
-    def _encode_image(image: np.ndarray) -> str:
-        """Encode a numpy array image to base64 string."""
+    def _open_capture(self) -> cv2.VideoCapture:
+        """
+        Open the source with an explicit OpenCV backend instead of letting
+        OpenCV probe each one. Falls back to autodetection if that fails.
+        """
+        if isinstance(self.source, int):
+            backend = cv2.CAP_V4L2 if platform.system() == "Linux" else cv2.CAP_ANY
+        else:
+            # Streams and files both go through FFmpeg
+            backend = cv2.CAP_FFMPEG
+            if self.source.startswith("rtsp://"):
+                # Read by OpenCV when the capture is opened; an existing value wins
+                os.environ.setdefault(
+                    "OPENCV_FFMPEG_CAPTURE_OPTIONS",
+                    "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay"
+                )
+        
+        capture = cv2.VideoCapture(self.source, backend)
+        if backend != cv2.CAP_ANY and not capture.isOpened():
+            capture.release()
+            capture = cv2.VideoCapture(self.source)
+        return capture
+    
+    def _open_stream(self):
+        """
+        Open an RTSP source with PyAV, decoding on the GPU when possible.
+        Falls back to software decoding if the hardware decoder is unavailable.
+        """
+        options = {
+            "rtsp_transport": "tcp",
+            "timeout": "5000000",  # socket timeout in microseconds
+            "fflags": "nobuffer",
+            "flags": "low_delay"
+        }
+        
+        device = settings.video_hwaccel or ("cuda" if torch.cuda.is_available() else None)
+        if device and HWAccel is not None:
+            logger.info(f"Decoding camera {self.camera_id} with {device} hwaccel")
+            return av.open(
+                self.source,
+                options=options,
+                hwaccel=HWAccel(device_type=device, allow_software_fallback=True)
+            )
+        return av.open(self.source, options=options)
+    
+    def _stream_loop(self):
+        """
+        Capture loop for PyAV-decoded streams running in background thread.
+        Owns the container: it is closed here once decoding has stopped.
+        """
+        interval = 1.0 / settings.target_fps
+        last_retrieved = 0.0
+        container = self._container
+        
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_image)
+            # Every packet must be decoded to keep the H.264 reference chain,
+            # but only frames the inference loop consumes are converted
+            for frame in container.decode(video=0):
+                if not self._running:
+                    break
+                
+                now = time.monotonic()
+                if now - last_retrieved < interval:
+                    continue
+                last_retrieved = now
+                
+                image = frame.to_ndarray(format="bgr24")
+                if not self._has_motion(image):
+                    continue
+                
+                with self._latest_lock:
+                    self._latest = image
+                if self._frame_ready:
+                    self._frame_ready.set()
+            
+            if self._running:
+                logger.warning(f"Stream ended on camera {self.camera_id}")
+        except Exception as e:
+            if self._running:
+                logger.error(f"Stream error on camera {self.camera_id}: {e}")
+        finally:
+            # Report a dead stream as stopped instead of running
+            self._running = False
+            container.close()
+            self._container = None
+    
+    def _has_motion(self, frame: np.ndarray) -> bool:
+        """
+        Check a frame for motion before it is queued for inference.
+        Compares a 64x64 grayscale thumbnail against a running mean of
+        previous thumbnails; static scenes never reach the model.
+        """
+        if settings.motion_threshold <= 0:
+            return True
+        
+        small = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        if self._motion_ref is None:
+            self._motion_ref = gray
+            return True
+        
+        diff = float(cv2.absdiff(gray, self._motion_ref).mean())
+        cv2.accumulateWeighted(gray, self._motion_ref, 0.05)
+        return diff >= settings.motion_threshold
+    
+    @property
+    def has_frame(self) -> bool:
+        """Check if a captured frame is waiting to be taken."""
+        return self._latest is not None
+    
+    def take_frame(self) -> Optional[np.ndarray]:
+        """Take the newest captured frame, if one is waiting."""
+        with self._latest_lock:
+            frame, self._latest = self._latest, None
+        return frame
+    
+    def _process_frame(
+        self,
+        frame: np.ndarray,
+        result,
+        names: Dict[int, str],
+        transform: tuple[float, int, int]
+    ):
+        """
+        Process the detection result for a single frame.
+        
+        Args:
+            frame: Original BGR frame the detection ran on
+            result: Ultralytics result for the letterboxed frame
+            names: Class id to name mapping of the model
+            transform: Letterbox (scale, pad_x, pad_y) applied to the frame
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return
+        
+        # One device-to-host copy of the packed [x1, y1, x2, y2, conf, cls]
+        # rows instead of a sync per field or per box (float32 even for FP16 runs)
+        data = boxes.data.float().cpu().numpy()
+        cls = data[:, -1].astype(np.int32)
+        conf = np.ascontiguousarray(data[:, -2])
+        xyxy = data[:, :4]
+        
+        # Map boxes from the letterboxed input back onto the original frame
+        scale, pad_x, pad_y = transform
+        height, width = frame.shape[:2]
+        xyxy = (xyxy - (pad_x, pad_y, pad_x, pad_y)) / scale
+        xyxy = np.clip(xyxy, 0, (width, height, width, height)).astype(np.int32)
+        
+        # Keep non-empty target class boxes with sufficient confidence
+        keep = postprocess.filter_boxes(cls, conf, xyxy, self._target_array, self._conf_th)
+        
+        for idx in keep:
+            class_id = int(cls[idx])
+            confidence = float(conf[idx])
             
-            # Encode to JPEG
-            buffer = BytesIO()
-            pil_image.save(buffer, format="JPEG", quality=85)
-            buffer.seek(0)
+            # Get bounding box coordinates
+            bbox = tuple(xyxy[idx].tolist())
+            x1, y1, x2, y2 = bbox
             
-            # Base64 encode
-            return base64.b64encode(buffer.getvalue()).decode("utf-8")
+            # Get class name
+            class_name = names.get(class_id, "unknown")
+            
+            # Encode off the inference thread; the crop is copied so the
+            # worker does not hold on to the full frame
+            cropped = frame[y1:y2, x1:x2]
+            if self._encode_pool:
+                self._encode_pool.submit(
+                    self._emit_detection, cropped.copy(), class_id, class_name, confidence, bbox
+                )
+            else:
+                self._emit_detection(cropped, class_id, class_name, confidence, bbox)
+    
+    def _emit_detection(
+        self,
+        cropped: np.ndarray,
+        class_id: int,
+        class_name: str,
+        confidence: float,
+        bbox: tuple[int, int, int, int]
+    ):
+        """Encode a detection crop and hand the detection to the callback."""
+        detection = Detection(
+            class_id=class_id,
+            class_name=class_name,
+            confidence=confidence,
+            bbox=bbox,
+            cropped_image_jpeg=self._encode_image(cropped)
+        )
+        
+        count = next(self._detection_count)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Detection: %s (%.2f) at %s on camera %s",
+                class_name, confidence, bbox, self.camera_id
+            )
+        elif count % self.LOG_EVERY == 0:
+            logger.info(
+                "%d detections on camera %s, latest: %s (%.2f)",
+                count, self.camera_id, class_name, confidence
+            )
+        
+        # Trigger callback if set
+        if self.on_detection:
+            try:
+                self.on_detection(self.camera_id, detection)
+            except Exception as e:
+                logger.exception(f"Error in detection callback: {e}")
+    
+    @staticmethod
+    def _encode_image(image: np.ndarray) -> bytes:
+        """Encode a numpy array image to JPEG bytes."""
+        try:
+            # Encode the BGR crop to JPEG directly (libjpeg-turbo, SIMD)
+            ok, buffer = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+            if not ok:
+                return b""
+            return buffer.tobytes()
         except Exception as e:
             logger.error(f"Error encoding image: {e}")
-            return ""
+            return b""
     
     @property
     def is_running(self) -> bool:
@@ -209,11 +417,129 @@ class CameraHandler:
 class VisionEngine:
     """
     Manages multiple camera handlers and coordinates detection events.
+    A single shared YOLO model runs one batched forward pass per tick over
+    the newest frame from every camera.
     """
     
+    # Artifact written by model.export() for each format, next to the .pt
+    EXPORT_SUFFIXES = {
+        "engine": ".engine",
+        "openvino": "_openvino_model",
+        "ncnn": "_ncnn_model",
+    }
+    
     def __init__(self):
         self.cameras: Dict[str, CameraHandler] = {}
         self._detection_callback: Optional[Callable] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Set by camera threads when a frame arrives; wakes the inference loop
+        self._frame_ready = threading.Event()
+        # Shared by all cameras so JPEG encoding overlaps the next forward pass
+        self._encode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vision-encode")
+        
+        # Loaded by load_model(); exporting can take minutes, so not at import
+        self.model: Optional[YOLO] = None
+        self._model_lock = threading.Lock()
+        # Frames per forward pass; reduced to 1 for backends without batching
+        self._max_batch = settings.max_batch_size
+        # FP16 inference on CUDA; exported engines keep their own precision
+        self._predict_args = {
+            "verbose": False,
+            "imgsz": settings.imgsz,
+            "half": torch.cuda.is_available()
+        }
+        # Letterboxed BGR frames (NHWC uint8) reused for every batch. On CUDA
+        # Ultralytics uploads the stacked uint8 batch and converts and scales
+        # it on the device, so only 8-bit pixels cross PCIe, once per pass.
+        self._letterbox_buf: Optional[np.ndarray] = None
+    
+    @property
+    def is_ready(self) -> bool:
+        """Check if the YOLO model is loaded and cameras can be added."""
+        return self.model is not None
+    
+    def load_model(self):
+        """
+        Load, export and warm up the shared YOLO model if not done yet.
+        Called in the background at application startup.
+        """
+        with self._model_lock:
+            if self.model is not None:
+                return
+            
+            model = self._load_model()
+            size = settings.imgsz
+            self._letterbox_buf = np.empty((self._max_batch, size, size, 3), dtype=np.uint8)
+            self.model = model
+            self._warmup()
+    
+    @staticmethod
+    def _select_export_format() -> tuple[str, dict]:
+        """Pick the fastest inference backend for this host."""
+        if torch.cuda.is_available():
+            return "engine", {"half": True, "dynamic": True, "batch": settings.max_batch_size}
+        if platform.machine().lower() in ("aarch64", "arm64", "armv7l"):
+            return "ncnn", {"half": True}
+        if settings.model_int8:
+            return "openvino", {"dynamic": True, "int8": True, "data": settings.int8_calibration_data}
+        return "openvino", {"dynamic": True}
+    
+    def _load_model(self) -> YOLO:
+        """
+        Load the YOLO model, exported to the fastest backend for this host.
+        The exported artifact is cached next to the .pt file so later starts
+        skip the export. Falls back to the PyTorch model if export fails.
+        """
+        logger.info(f"Loading YOLO model: {settings.model_path}")
+        model = YOLO(settings.model_path)
+        
+        if not settings.model_export or not settings.model_path.endswith(".pt"):
+            return model
+        
+        export_format, export_args = self._select_export_format()
+        
+        # The cached artifact is keyed on everything baked into it, so a
+        # changed IMGSZ or MAX_BATCH_SIZE triggers a new export
+        tag = f"_{settings.imgsz}"
+        if "batch" in export_args:
+            tag += f"_b{export_args['batch']}"
+        if export_args.get("int8"):
+            tag += "_int8"
+        exported = os.path.splitext(settings.model_path)[0] + tag + self.EXPORT_SUFFIXES[export_format]
+        
+        try:
+            if not os.path.exists(exported):
+                logger.info(f"Exporting YOLO model to {export_format}")
+                output = model.export(
+                    format=export_format, imgsz=settings.imgsz, **export_args
+                )
+                os.replace(str(output).rstrip(os.sep), exported)
+            
+            logger.info(f"Loading exported YOLO model: {exported}")
+            exported_model = YOLO(exported, task="detect")
+        except Exception as e:
+            logger.warning(f"YOLO export to {export_format} failed, using PyTorch model: {e}")
+            return model
+        
+        # NCNN only runs one image per call
+        if export_format == "ncnn":
+            self._max_batch = 1
+        return exported_model
+    
+    def _warmup(self):
+        """
+        Run one blank frame through the model so backend initialization and
+        kernel autotuning happen at startup rather than on the first batch.
+        """
+        postprocess.warmup()
+        
+        blank = np.zeros((settings.imgsz, settings.imgsz, 3), dtype=np.uint8)
+        try:
+            inputs, _ = self._preprocess([blank])
+            self.model(inputs, **self._predict_args)
+        except Exception as e:
+            logger.warning(f"YOLO warmup failed: {e}")
     
     def set_detection_callback(self, callback: Callable[[str, Detection], None]):
         """Set the callback function for detection events."""
@@ -225,24 +551,33 @@ class VisionEngine:
             logger.warning(f"Camera {camera_id} already exists")
             return False
         
+        if not self.is_ready:
+            logger.warning(f"Cannot add camera {camera_id}: YOLO model is not loaded")
+            return False
+        
         handler = CameraHandler(
             camera_id=camera_id,
             source=source,
-            on_detection=self._detection_callback
+            on_detection=self._detection_callback,
+            encode_pool=self._encode_pool,
+            frame_ready=self._frame_ready
         )
         
         if handler.start():
-            self.cameras[camera_id] = handler
+            with self._lock:
+                self.cameras[camera_id] = handler
+                self._ensure_inference_loop()
             return True
         return False
     
     def remove_camera(self, camera_id: str) -> bool:
         """Stop and remove a camera."""
-        if camera_id not in self.cameras:
-            return False
-        
-        self.cameras[camera_id].stop()
-        del self.cameras[camera_id]
+        with self._lock:
+            if camera_id not in self.cameras:
+                return False
+            
+            handler = self.cameras.pop(camera_id)
+        handler.stop()
         return True
     
     def get_camera_status(self, camera_id: str) -> Optional[Dict[str, Any]]:
@@ -263,9 +598,109 @@ class VisionEngine:
     
     def stop_all(self):
         """Stop all cameras."""
-        for handler in self.cameras.values():
+        with self._lock:
+            handlers = list(self.cameras.values())
+            self.cameras.clear()
+            thread = self._thread
+        
+        for handler in handlers:
             handler.stop()
-        self.cameras.clear()
+        if thread:
+            thread.join(timeout=5.0)
+    
+    def _preprocess(self, frames: list[np.ndarray]) -> tuple[list[np.ndarray], list[tuple[float, int, int]]]:
+        """
+        Letterbox a group of BGR frames into the preallocated frame buffer.
+        The frames already have the model's input size, so Ultralytics only
+        stacks them; passing them as uint8 arrays keeps its own preprocessing
+        (and no copy of the batch back to the host for orig_img).
+        
+        Returns:
+            Tuple of (letterboxed frame views, per-frame (scale, pad_x, pad_y))
+        """
+        size = settings.imgsz
+        transforms = []
+        
+        for i, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            scale = min(size / height, size / width)
+            new_w, new_h = round(width * scale), round(height * scale)
+            pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+            
+            # Grey padding as in Ultralytics' own letterbox, image centred
+            canvas = self._letterbox_buf[i]
+            canvas.fill(114)
+            cv2.resize(
+                frame, (new_w, new_h),
+                dst=canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                interpolation=cv2.INTER_LINEAR
+            )
+            transforms.append((scale, pad_x, pad_y))
+        
+        return list(self._letterbox_buf[:len(frames)]), transforms
+    
+    def _ensure_inference_loop(self):
+        """Start the batched inference loop if needed. Caller must hold the lock."""
+        if self._thread is not None:
+            return
+        
+        self._thread = threading.Thread(
+            target=self._inference_loop,
+            daemon=True,
+            name="vision-inference"
+        )
+        self._thread.start()
+    
+    def _inference_loop(self):
+        """
+        Main inference loop running in background thread.
+        Sleeps until a camera delivers a frame, then gives the other running
+        cameras up to a quarter frame interval to catch up so they share the
+        forward pass.
+        """
+        # Static scenes (motion gate) and dead streams never deliver, so the
+        # catch-up wait is kept short and skips stopped cameras
+        coalesce_s = 1.0 / settings.target_fps / 4
+        
+        while True:
+            with self._lock:
+                handlers = list(self.cameras.values())
+                if not handlers:
+                    self._thread = None
+                    return
+            
+            # Timeout only so removed cameras are noticed
+            if not self._frame_ready.wait(timeout=1.0):
+                continue
+            
+            deadline = time.monotonic() + coalesce_s
+            while True:
+                self._frame_ready.clear()
+                if all(handler.has_frame for handler in handlers if handler.is_running):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._frame_ready.wait(remaining)
+            
+            # Newest frame from each camera that has one ready
+            batch = []
+            for handler in handlers:
+                frame = handler.take_frame()
+                if frame is not None:
+                    batch.append((handler, frame))
+            
+            # Each group is letterboxed into the shared frame buffer; boxes come
+            # back in letterbox coordinates and are mapped per frame
+            for start in range(0, len(batch), self._max_batch):
+                group = batch[start:start + self._max_batch]
+                try:
+                    inputs, transforms = self._preprocess([frame for _, frame in group])
+                    results = self.model(inputs, **self._predict_args)
+                    for (handler, frame), result, transform in zip(group, results, transforms):
+                        handler._process_frame(frame, result, self.model.names, transform)
+                except Exception as e:
+                    logger.exception(f"Error processing frame: {e}")
 
 
 # Global vision engine instance
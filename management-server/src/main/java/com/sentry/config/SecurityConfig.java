@@ -52,7 +52,7 @@ public class SecurityConfig {
                     .requestMatchers("/ws/**").permitAll()
                     
                     // AI Engine internal endpoints (API key auth)
-                    .requestMatchers(HttpMethod.POST, "/api/v1/alerts").hasAnyRole("AI_SERVICE", "ADMIN")
+                    .requestMatchers(HttpMethod.POST, "/api/v1/alerts", "/api/v1/alerts/batch").hasAnyRole("AI_SERVICE", "ADMIN")
                     
                     // Protected endpoints
                     .requestMatchers("/api/v1/alerts/**").hasAnyRole("USER", "OPERATOR", "ADMIN")
@@ -8,10 +8,16 @@ import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.data.domain.Page;
 import org.springframework.http.HttpStatus;
+import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 import org.springframework.security.core.Authentication;
+import org.springframework.validation.annotation.Validated;
 import org.springframework.web.bind.annotation.*;
+import org.springframework.web.multipart.MultipartFile;
 
+import java.io.IOException;
+import java.util.Base64;
+import java.util.List;
 import java.util.Map;
 
 /**
@@ -21,6 +27,7 @@ import java.util.Map;
 @RequestMapping("/api/v1/alerts")
 @RequiredArgsConstructor
 @Slf4j
+@Validated
 public class AlertController {
 
     private final AlertService alertService;
@@ -36,6 +43,33 @@ public class AlertController {
         return ResponseEntity.status(HttpStatus.CREATED).body(alert);
     }
 
+    /**
+     * Receive alert with a raw JPEG snapshot from AI Engine.
+     * The "meta" part carries the JSON alert payload.
+     * Authenticated via API key.
+     */
+    @PostMapping(consumes = MediaType.MULTIPART_FORM_DATA_VALUE)
+    public ResponseEntity<Alert> createAlertWithImage(
+            @Valid @RequestPart("meta") AlertPayload payload,
+            @RequestPart("image") MultipartFile image
+    ) throws IOException {
+        log.info("Received alert from camera {}: {}", payload.getCameraId(), payload.getAlertType());
+        payload.setImageBase64(Base64.getEncoder().encodeToString(image.getBytes()));
+        Alert alert = alertService.createAlert(payload);
+        return ResponseEntity.status(HttpStatus.CREATED).body(alert);
+    }
+
+    /**
+     * Receive a batch of alerts from AI Engine.
+     * Authenticated via API key.
+     */
+    @PostMapping("/batch")
+    public ResponseEntity<List<Alert>> createAlerts(@RequestBody List<@Valid AlertPayload> payloads) {
+        log.info("Received batch of {} alerts", payloads.size());
+        List<Alert> alerts = alertService.createAlerts(payloads);
+        return ResponseEntity.status(HttpStatus.CREATED).body(alerts);
+    }
+
     /**
      * Get paginated list of alerts.
      */
@@ -34,16 +34,7 @@ public class AlertService {
      */
     @Transactional
     public Alert createAlert(AlertPayload payload) {
-        Alert alert = Alert.builder()
-                .cameraId(payload.getCameraId())
-                .alertType(payload.getAlertType())
-                .message(payload.getDescription())
-                .imageData(payload.getImageBase64())
-                .timestamp(payload.getTimestamp())
-                .acknowledged(false)
-                .build();
-
-        Alert savedAlert = alertRepository.save(alert);
+        Alert savedAlert = alertRepository.save(toAlert(payload));
         
         log.info("Alert created: {} from camera {}", savedAlert.getId(), savedAlert.getCameraId());
 
@@ -53,6 +44,39 @@ public class AlertService {
         return savedAlert;
     }
 
+    /**
+     * Create alerts from a batch of AI Engine payloads in one transaction.
+     * Each saved alert is broadcast to WebSocket subscribers.
+     */
+    @Transactional
+    public List<Alert> createAlerts(List<AlertPayload> payloads) {
+        List<Alert> alerts = payloads.stream()
+                .map(this::toAlert)
+                .toList();
+
+        List<Alert> savedAlerts = alertRepository.saveAll(alerts);
+
+        log.info("Batch of {} alerts created", savedAlerts.size());
+
+        savedAlerts.forEach(this::broadcastAlert);
+
+        return savedAlerts;
+    }
+
+    /**
+     * Map an AI Engine payload to a new, unacknowledged alert.
+     */
+    private Alert toAlert(AlertPayload payload) {
+        return Alert.builder()
+                .cameraId(payload.getCameraId())
+                .alertType(payload.getAlertType())
+                .message(payload.getDescription())
+                .imageData(payload.getImageBase64())
+                .timestamp(payload.getTimestamp())
+                .acknowledged(false)
+                .build();
+    }
+
     /**
      * Broadcast alert to WebSocket topic.
      */